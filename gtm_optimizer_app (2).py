@@ -1,7 +1,33 @@
 import streamlit as st
-from scipy.optimize import linprog
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+# The equality rows pin every AE and AM count, and the only cost is on BDRs,
+# which no row requires, so the optimum always hires zero BDRs and the LP
+# reduces to a closed-form feasibility check. Flip this to route through HiGHS
+# (via highspy) if the objective ever makes AE, AM or BDR counts a real trade-off.
+USE_LP_SOLVER = False
+# HiGHS's default primal_feasibility_tolerance, applied by the closed-form check
+# in each row's own units: dollars for the quota rows, heads for the caps.
+PRIMAL_FEASIBILITY_TOL = 1e-7
+
+SCENARIOS = ("Base", "Optimistic", "Conservative")
+METRIC_LABELS = (
+    "Comm AEs", "Ent AEs", "AMs",
+    "Comm BDRs", "Ent BDRs",
+    "Expansion ARR", "Comm New ARR", "Ent New ARR",
+    "Comm Pipeline ($)", "Ent Pipeline ($)",
+    "Total Meetings Required"
+)
+SENSITIVITY_LABELS = ("Comm Win Rate -10%", "Ent Win Rate -10%", "ASP +5% (Comm)", "ASP +5% (Ent)")
+# Static bar chart spec for the pipeline breakdown; only the inline data changes.
+PIPELINE_SPEC = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Segment", "type": "nominal", "axis": {"labelAngle": 0}},
+        "y": {"field": "Pipeline", "type": "quantitative", "title": "Pipeline ($)"},
+    },
+}
 
 st.set_page_config(page_title="GTM Planner Optimizer", layout="wide")
 st.title("📊 GTM Optimization Planner")
@@ -12,114 +38,232 @@ Use the controls below to adjust assumptions and hiring constraints.
 """)
 
 # --- Scenario Selection ---
-scenario = st.selectbox("Choose Scenario", ["Base", "Optimistic", "Conservative"])
+scenario = st.selectbox("Choose Scenario", SCENARIOS)
 
 # --- Inputs ---
-st.sidebar.header(f"{scenario} Assumptions")
-target_arr = st.sidebar.number_input("Target ARR ($)", value=28000000)
-starting_arr = st.sidebar.number_input("Starting ARR ($)", value=12700000)
-ndr_percent = st.sidebar.slider("Net Dollar Retention (%)", 100, 200, 145)
-
-comm_asp = st.sidebar.number_input("Commercial ASP ($)", value=15000)
-ent_asp = st.sidebar.number_input("Enterprise ASP ($)", value=100000)
-comm_win_rate = st.sidebar.slider("Comm Win Rate", 0.3, 1.0, 0.55)
-ent_win_rate = st.sidebar.slider("Ent Win Rate", 0.3, 1.0, 0.40)
-mtg_to_sqo = st.sidebar.slider("Meeting to SQO Conversion", 0.1, 1.0, 0.33)
-
-comm_quota = st.sidebar.number_input("Comm AE Quota", value=600000)
-ent_quota = st.sidebar.number_input("Ent AE Quota", value=600000)
-am_quota = st.sidebar.number_input("AM Quota", value=750000)
-
-# --- Constraints ---
-st.sidebar.header("Constraints")
-min_comm_ae = st.sidebar.number_input("Min Comm AEs", value=2)
-min_ent_ae = st.sidebar.number_input("Min Ent AEs", value=1)
-max_total_ae = st.sidebar.number_input("Max Total AEs", value=20)
-
-bdr_meetings_comm = st.sidebar.number_input("Comm BDR Meetings/mo", value=25)
-bdr_meetings_ent = st.sidebar.number_input("Ent BDR Meetings/mo", value=15)
-bdr_budget = st.sidebar.number_input("Total BDR Budget", value=8)
+# Grouped in a form so edits are batched into one rerun per "Run" click.
+with st.sidebar.form("gtm_inputs"):
+    st.header(f"{scenario} Assumptions")
+    target_arr = st.number_input("Target ARR ($)", value=28000000)
+    starting_arr = st.number_input("Starting ARR ($)", value=12700000)
+    ndr_percent = st.slider("Net Dollar Retention (%)", 100, 200, 145)
+
+    comm_asp = st.number_input("Commercial ASP ($)", value=15000)
+    ent_asp = st.number_input("Enterprise ASP ($)", value=100000)
+    comm_win_rate = st.slider("Comm Win Rate", 0.3, 1.0, 0.55)
+    ent_win_rate = st.slider("Ent Win Rate", 0.3, 1.0, 0.40)
+    mtg_to_sqo = st.slider("Meeting to SQO Conversion", 0.1, 1.0, 0.33)
+
+    comm_quota = st.number_input("Comm AE Quota", value=600000)
+    ent_quota = st.number_input("Ent AE Quota", value=600000)
+    am_quota = st.number_input("AM Quota", value=750000)
+
+    # --- Constraints ---
+    st.header("Constraints")
+    min_comm_ae = st.number_input("Min Comm AEs", value=2)
+    min_ent_ae = st.number_input("Min Ent AEs", value=1)
+    max_total_ae = st.number_input("Max Total AEs", value=20)
+
+    bdr_meetings_comm = st.number_input("Comm BDR Meetings/mo", value=25)
+    bdr_meetings_ent = st.number_input("Ent BDR Meetings/mo", value=15)
+    bdr_budget = st.number_input("Total BDR Budget", value=8)
+
+    submitted = st.form_submit_button("Run")
 
 # --- Calculations ---
-expansion_arr = starting_arr * (ndr_percent / 100 - 1)
-new_logo_arr_needed = target_arr - starting_arr - expansion_arr
-comm_new_arr = new_logo_arr_needed * 0.6
-ent_new_arr = new_logo_arr_needed * 0.4
+def derive_metrics(target_arr, starting_arr, ndr_percent, comm_win_rate, ent_win_rate, mtg_to_sqo):
+    expansion_arr = starting_arr * (ndr_percent / 100 - 1)
+    new_logo_arr_needed = target_arr - starting_arr - expansion_arr
+    comm_new_arr = new_logo_arr_needed * 0.6
+    ent_new_arr = new_logo_arr_needed * 0.4
+
+    comm_pipeline = comm_new_arr / comm_win_rate
+    ent_pipeline = ent_new_arr / ent_win_rate
+    comm_meetings_needed = comm_pipeline / mtg_to_sqo
+    ent_meetings_needed = ent_pipeline / mtg_to_sqo
 
-comm_pipeline = comm_new_arr / comm_win_rate
-ent_pipeline = ent_new_arr / ent_win_rate
-comm_meetings_needed = comm_pipeline / mtg_to_sqo
-ent_meetings_needed = ent_pipeline / mtg_to_sqo
+    total_meetings_needed = comm_meetings_needed + ent_meetings_needed
+    return expansion_arr, comm_new_arr, ent_new_arr, comm_pipeline, ent_pipeline, total_meetings_needed
 
-total_meetings_needed = comm_meetings_needed + ent_meetings_needed
 
 # --- Solver Formulation ---
-c = [0, 0, 0, 0, 0]  # AE Comm, AE Ent, AMs, BDR Comm, BDR Ent
-A_eq = [
-    [comm_quota, 0, 0, 0, 0],
-    [0, ent_quota, 0, 0, 0],
-    [0, 0, am_quota, 0, 0]
-]
-b_eq = [comm_new_arr, ent_new_arr, expansion_arr]
-
-A_ub = [
-    [1, 1, 0, 0, 0],
-    [0, 0, 0, 1, 1]
-]
-b_ub = [max_total_ae, bdr_budget]
-
-bounds = [
-    (min_comm_ae, None),
-    (min_ent_ae, None),
-    (0, None),
-    (0, None),
-    (0, None)
-]
-
-res = linprog(c=c, A_eq=A_eq, b_eq=b_eq, A_ub=A_ub, b_ub=b_ub, bounds=bounds, method='highs')
-
-if res.success:
-    ae_comm, ae_ent, ams, bdr_comm, bdr_ent = res.x
-    total_bdr_meetings = bdr_comm * bdr_meetings_comm * 12 + bdr_ent * bdr_meetings_ent * 12
-
-    df = pd.DataFrame({
-        "Metric": [
-            "Comm AEs", "Ent AEs", "AMs",
-            "Comm BDRs", "Ent BDRs",
-            "Expansion ARR", "Comm New ARR", "Ent New ARR",
-            "Comm Pipeline ($)", "Ent Pipeline ($)",
-            "Total Meetings Required"
-        ],
-        "Value": [
-            round(ae_comm), round(ae_ent), round(ams),
-            round(bdr_comm), round(bdr_ent),
-            round(expansion_arr), round(comm_new_arr), round(ent_new_arr),
-            round(comm_pipeline), round(ent_pipeline),
-            round(total_meetings_needed)
-        ]
-    }).set_index("Metric")
-
-    st.subheader("📊 Summary Table")
-    st.dataframe(df)
-
-    st.subheader("📉 Scenario Risk Sensitivity")
-    sensitivity = pd.DataFrame({
-        "Variable": ["Comm Win Rate -10%", "Ent Win Rate -10%", "ASP +5% (Comm)", "ASP +5% (Ent)"],
-        "Impact on Pipeline ($)": [
-            round(comm_new_arr / (comm_win_rate * 0.9)),
-            round(ent_new_arr / (ent_win_rate * 0.9)),
-            round(comm_new_arr * 0.95 / comm_win_rate),
-            round(ent_new_arr * 0.95 / ent_win_rate)
-        ]
-    })
-    st.dataframe(sensitivity)
+def _solve_gtm_lp(comm_quota, ent_quota, am_quota, comm_new_arr, ent_new_arr, expansion_arr,
+                  max_total_ae, bdr_budget, min_comm_ae, min_ent_ae) -> tuple[float, ...] | None:
+    # Imported here so the default closed-form path never pays for them at startup.
+    import highspy
+    import scipy.sparse as sp
+
+    # AE Comm, AE Ent, AMs, BDR Comm, BDR Ent. Only BDRs carry a cost: when
+    # indifferent, hire none.
+    c = np.array([0, 0, 0, 1, 1], dtype=np.float64)
+    # Both constraint matrices are mostly zeros, so hand HiGHS its native CSC layout.
+    A_eq = sp.csc_matrix(
+        (np.array([comm_quota, ent_quota, am_quota], dtype=np.float64),
+         (np.array([0, 1, 2]), np.array([0, 1, 2]))),
+        shape=(3, 5))
+    b_eq = np.array([comm_new_arr, ent_new_arr, expansion_arr], dtype=np.float64)
+
+    A_ub = sp.csc_matrix((np.ones(4), ([0, 0, 1, 1], [0, 1, 3, 4])), shape=(2, 5))
+    b_ub = np.array([max_total_ae, bdr_budget], dtype=np.float64)
+
+    A = sp.vstack([A_eq, A_ub], format="csc")
+    row_lower = np.concatenate([b_eq, np.full(2, -highspy.kHighsInf)])
+    row_upper = np.concatenate([b_eq, b_ub])
+    col_lower = np.array([min_comm_ae, min_ent_ae, 0, 0, 0], dtype=np.float64)
+    col_upper = np.array([highspy.kHighsInf] * 3 + [bdr_budget] * 2, dtype=np.float64)
+
+    h = st.session_state.get("highs")
+    if h is None:
+        lp = highspy.HighsLp()
+        lp.num_col_ = 5
+        lp.num_row_ = 5
+        lp.col_cost_ = c
+        lp.col_lower_ = col_lower
+        lp.col_upper_ = col_upper
+        lp.row_lower_ = row_lower
+        lp.row_upper_ = row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", False)
+        # A 5x5 model gains nothing from presolve, and warm starts already
+        # reuse the basis, so go straight to simplex.
+        h.setOptionValue("presolve", "off")
+        h.setOptionValue("solver", "simplex")
+        h.passModel(lp)
+        st.session_state.highs = h
+    else:
+        # Only quotas, bounds and right-hand sides move between reruns, so patch
+        # them in place and let simplex restart from the previous optimal basis.
+        for i, quota in enumerate((comm_quota, ent_quota, am_quota)):
+            h.changeCoeff(i, i, quota)
+        idx = np.arange(5, dtype=np.int32)
+        h.changeColsBounds(5, idx, col_lower, col_upper)
+        h.changeRowsBounds(5, idx, row_lower, row_upper)
+
+    h.run()
+    if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        return None
+    # A plain tuple is hashable, so it can be part of build_tables' cache key.
+    return tuple(h.getSolution().col_value)
+
+
+def _pin_to_row(quota, arr, lower):
+    # Solve the equality row quota * x == arr for x >= lower. The row is in
+    # dollars, so like HiGHS allow PRIMAL_FEASIBILITY_TOL dollars of residual
+    # when x has to sit on its bound. A zero quota only pins x if arr is zero.
+    if quota:
+        x = arr / quota
+        if x >= lower:
+            return x
+    return lower if abs(quota * lower - arr) <= PRIMAL_FEASIBILITY_TOL else None
+
+
+def solve_gtm(comm_quota, ent_quota, am_quota, comm_new_arr, ent_new_arr, expansion_arr,
+              max_total_ae, bdr_budget, min_comm_ae, min_ent_ae) -> tuple[float, ...] | None:
+    # Each equality row pins one variable, and BDRs appear in no equality row
+    # while costing 1 each, so the optimum hires none whenever the budget allows.
+    ae_comm = _pin_to_row(comm_quota, comm_new_arr, min_comm_ae)
+    ae_ent = _pin_to_row(ent_quota, ent_new_arr, min_ent_ae)
+    ams = _pin_to_row(am_quota, expansion_arr, 0)
+    if ae_comm is None or ae_ent is None or ams is None:
+        return None
 
-    st.subheader("📈 Pipeline Breakdown")
-    chart_df = pd.DataFrame({
-        "Segment": ["Commercial", "Enterprise"],
-        "Pipeline ($)": [comm_pipeline, ent_pipeline]
+    feasible = (
+        ae_comm + ae_ent <= max_total_ae + PRIMAL_FEASIBILITY_TOL
+        and bdr_budget >= -PRIMAL_FEASIBILITY_TOL
+    )
+    return (ae_comm, ae_ent, ams, 0.0, 0.0) if feasible else None
+
+
+def plan_scenario(inputs_tuple, use_lp_solver):
+    (target_arr, starting_arr, ndr_percent, comm_win_rate, ent_win_rate, mtg_to_sqo,
+     comm_quota, ent_quota, am_quota, min_comm_ae, min_ent_ae, max_total_ae, bdr_budget) = inputs_tuple
+    derived = derive_metrics(target_arr, starting_arr, ndr_percent, comm_win_rate, ent_win_rate, mtg_to_sqo)
+    expansion_arr, comm_new_arr, ent_new_arr = derived[:3]
+
+    # The warm LP model lives in this session's state, so it is solved here,
+    # outside every cross-session cache; only the table build below is cached.
+    solver = _solve_gtm_lp if use_lp_solver else solve_gtm
+    solution = solver(comm_quota, ent_quota, am_quota, comm_new_arr, ent_new_arr, expansion_arr,
+                      max_total_ae, bdr_budget, min_comm_ae, min_ent_ae)
+    return None if solution is None else build_tables(derived, solution, comm_win_rate, ent_win_rate)
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def build_tables(derived, solution, comm_win_rate, ent_win_rate):
+    # cache_resource hands back shared references instead of copies; the
+    # tables are only ever read, so the per-call copy of cache_data is wasted.
+    # It never evicts on its own, so cap it: every distinct submission from any
+    # session would otherwise stay in memory for the life of the server.
+    # Keyed only on what the tables show: quotas, minimums and caps no longer
+    # matter once they have produced the solution.
+    (expansion_arr, comm_new_arr, ent_new_arr,
+     comm_pipeline, ent_pipeline, total_meetings_needed) = derived
+    ae_comm, ae_ent, ams, bdr_comm, bdr_ent = solution
+
+    # Every table reads from this one pack, so each value is computed exactly once.
+    metrics = dict(zip(METRIC_LABELS, (
+        ae_comm, ae_ent, ams,
+        bdr_comm, bdr_ent,
+        expansion_arr, comm_new_arr, ent_new_arr,
+        comm_pipeline, ent_pipeline,
+        total_meetings_needed
+    )))
+
+    comm_new, ent_new = metrics["Comm New ARR"], metrics["Ent New ARR"]
+    numerators = np.array([comm_new, ent_new, comm_new * 0.95, ent_new * 0.95])
+    denoms = np.array([comm_win_rate * 0.9, ent_win_rate * 0.9, comm_win_rate, ent_win_rate])
+
+    # Stage both tables' values in one float64 buffer and round them in a single pass.
+    n_metrics = len(METRIC_LABELS)
+    raw = np.empty(n_metrics + len(SENSITIVITY_LABELS), dtype=np.float64)
+    raw[:n_metrics] = [metrics[label] for label in METRIC_LABELS]
+    np.divide(numerators, denoms, out=raw[n_metrics:])
+    rounded = np.rint(raw).astype(np.int64)
+
+    summary_df = pd.DataFrame({"Value": rounded[:n_metrics]}, index=pd.Index(METRIC_LABELS, name="Metric"))
+    sensitivity_df = pd.DataFrame({
+        "Variable": SENSITIVITY_LABELS,
+        "Impact on Pipeline ($)": rounded[n_metrics:]
     })
-    st.bar_chart(chart_df.set_index("Segment"))
 
-else:
-    st.error("Optimization failed. Try adjusting constraints.")
+    chart_spec = {**PIPELINE_SPEC, "data": {"values": [
+        {"Segment": "Commercial", "Pipeline": metrics["Comm Pipeline ($)"]},
+        {"Segment": "Enterprise", "Pipeline": metrics["Ent Pipeline ($)"]},
+    ]}}
+    return summary_df, sensitivity_df, chart_spec
+
+
+def render_scenario(scenario, tables):
+    if tables is not None:
+        summary_df, sensitivity_df, chart_spec = tables
+
+        st.subheader("📊 Summary Table")
+        st.dataframe(summary_df)
+
+        st.subheader("📉 Scenario Risk Sensitivity")
+        st.dataframe(sensitivity_df)
+
+        st.subheader("📈 Pipeline Breakdown")
+        st.vega_lite_chart(spec=chart_spec)
+
+    else:
+        st.error(f"Optimization failed for the {scenario} scenario. Try adjusting constraints.")
+
+
+# Same order plan_scenario unpacks them in.
+inputs_tuple = (
+    target_arr, starting_arr, ndr_percent, comm_win_rate, ent_win_rate, mtg_to_sqo,
+    comm_quota, ent_quota, am_quota, min_comm_ae, min_ent_ae, max_total_ae, bdr_budget
+)
+
+# Keep the last result around so the tables stay visible between submissions.
+# The scenario is stored with it: the selectbox sits outside the form, so its
+# current value may not be the one these tables were computed for.
+if submitted or "last_result" not in st.session_state:
+    st.session_state.last_result = (scenario, plan_scenario(inputs_tuple, USE_LP_SOLVER))
+render_scenario(*st.session_state.last_result)
@@ -0,0 +1,105 @@
+"""Equivalence checks between the closed-form solve and the HiGHS LP path."""
+import importlib.util
+import itertools
+import random
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parent.parent / "gtm_optimizer_app (2).py"
+
+DEFAULTS = dict(comm_quota=600000, ent_quota=600000, am_quota=750000,
+                max_total_ae=20, bdr_budget=8, min_comm_ae=2, min_ent_ae=1)
+
+
+@pytest.fixture(scope="module")
+def app():
+    # The app is a Streamlit script; executing it outside `streamlit run`
+    # renders nothing and leaves its functions importable.
+    spec = importlib.util.spec_from_file_location("gtm_optimizer_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def plan(app, target_arr=28000000, starting_arr=12700000, ndr_percent=145, **overrides):
+    expansion_arr, comm_new_arr, ent_new_arr, *_ = app.derive_metrics(
+        target_arr, starting_arr, ndr_percent, 0.55, 0.40, 0.33)
+    args = dict(DEFAULTS, comm_new_arr=comm_new_arr, ent_new_arr=ent_new_arr,
+                expansion_arr=expansion_arr)
+    args.update(overrides)
+    return args
+
+
+def assert_same(app, args):
+    closed = app.solve_gtm(**args)
+    lp = app._solve_gtm_lp(**args)
+    assert (closed is None) == (lp is None), (args, closed, lp)
+    if closed is not None:
+        assert closed == pytest.approx(lp, rel=1e-9, abs=1e-9), (args, closed, lp)
+    return closed
+
+
+def test_defaults(app):
+    assert assert_same(app, plan(app)) == pytest.approx((9.585, 6.39, 7.62, 0, 0))
+
+
+def test_round_inputs_landing_on_a_minimum(app):
+    # 110 / 100 - 1 leaves float noise in expansion_arr, so ae_comm comes out
+    # as 1.999999999999999 against a minimum of 2.
+    result = assert_same(app, plan(app, target_arr=13000000, starting_arr=10000000, ndr_percent=110))
+    assert [round(x) for x in result[:3]] == [2, 1, 1]
+
+
+def test_zero_quota_with_zero_target(app):
+    result = assert_same(app, plan(app, ndr_percent=100, am_quota=0, max_total_ae=40))
+    assert result == pytest.approx((15.3, 10.2, 0, 0, 0))
+
+
+@pytest.mark.parametrize("quota", ["comm_quota", "ent_quota", "am_quota"])
+def test_zero_quota_with_nonzero_target(app, quota):
+    assert assert_same(app, plan(app, **{quota: 0})) is None
+
+
+@pytest.mark.parametrize("quota", [1, 100, 600000, 5e6])
+@pytest.mark.parametrize("minimum", [2, 10])
+@pytest.mark.parametrize("shortfall, feasible", [
+    (0.0, True), (-1e-10, True), (1e-10, True), (1e-9, True),
+    (1e-5, False), (1e-3, False), (1.0, False),
+])
+def test_just_below_a_minimum(app, quota, minimum, shortfall, feasible):
+    # Noise-sized dollar shortfalls on the quota row must pass and real ones
+    # must fail. Real shortfalls are scaled to the quota, i.e. in heads: in the
+    # band between 1e-7 dollars and 1e-7 heads HiGHS's verdict depends on its
+    # scaling and warm basis, so neither side is checked there.
+    dollars = shortfall if feasible else shortfall * quota
+    args = dict(DEFAULTS, comm_quota=quota, min_comm_ae=minimum, comm_new_arr=minimum * quota - dollars,
+                ent_new_arr=600000, expansion_arr=0, max_total_ae=40)
+    assert (assert_same(app, args) is not None) == feasible
+
+
+def test_random_inputs(app):
+    rng = random.Random(0)
+    for _ in range(500):
+        assert_same(app, dict(
+            comm_quota=rng.choice([300000, 600000, 900000]), ent_quota=rng.choice([400000, 600000]),
+            am_quota=rng.choice([0, 500000, 750000]), comm_new_arr=rng.uniform(-1e6, 1.5e7),
+            ent_new_arr=rng.uniform(-1e6, 1e7), expansion_arr=rng.choice([0, rng.uniform(0, 1e7)]),
+            max_total_ae=rng.randint(0, 40), bdr_budget=rng.randint(-1, 10),
+            min_comm_ae=rng.randint(0, 5), min_ent_ae=rng.randint(0, 5)))
+
+
+def test_round_inputs_on_every_bound(app):
+    # Round-number widget values with the AE minimums and the AE cap set to the
+    # exact pinned counts, where float noise decides feasibility.
+    grid = itertools.product(range(10_000_000, 40_000_001, 2_500_000), range(5_000_000, 20_000_001, 5_000_000),
+                             (100, 110, 120, 145, 200),
+                             ((600000, 600000, 750000), (500000, 400000, 500000), (300000, 200000, 1000000)))
+    for target_arr, starting_arr, ndr_percent, (comm_quota, ent_quota, am_quota) in grid:
+        base = plan(app, target_arr, starting_arr, ndr_percent,
+                    comm_quota=comm_quota, ent_quota=ent_quota, am_quota=am_quota)
+        ae_comm = base["comm_new_arr"] / comm_quota
+        ae_ent = base["ent_new_arr"] / ent_quota
+        for overrides in (dict(min_comm_ae=round(ae_comm), min_ent_ae=round(ae_ent), max_total_ae=40),
+                          dict(min_comm_ae=0, min_ent_ae=0, max_total_ae=round(ae_comm + ae_ent))):
+            assert_same(app, dict(base, **overrides))